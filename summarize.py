@@ -1,25 +1,54 @@
 #!/usr/bin/env python3
+import io
 import os
+import sys
 from pathlib import Path
 import argparse
-from collections import defaultdict
 import re
 import json
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
 try:
     import pathspec
 except ImportError:
     pathspec = None
 
-# allowed file extensions
-ALLOWED_EXTENSIONS = [
+try:
+    import tomli
+except ImportError:
+    try:
+        import tomllib as tomli
+    except ImportError:
+        tomli = None
+
+try:
+    import yaml
+    # libyaml's C loader when PyYAML was built with it; same safe tag set
+    _YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+except ImportError:
+    yaml = None
+
+# allowed file extensions (frozenset for O(1) membership tests while walking)
+ALLOWED_EXTENSIONS = frozenset((
     '.tf', '.tfvars', '.py', '.sh', '.java', '.yaml', '.yml', '.json',
     '.md', '.txt', '.kt', '.groovy', '.kts', '.gradle', '.properties',
-    '.xml', '.sql', '.csv', '.ini', '.sh', '.conf', '.cfg', '.log', '.gitignore',
+    '.xml', '.sql', '.csv', '.ini', '.conf', '.cfg', '.log', '.gitignore',
     '.dockerignore', '.editorconfig', '.yml.example', '.yaml.example', '.go',
     '.service', '.toml', '.proto', '.cs', '.ts', '.js', '.dockerfile'
-]
+))
+
+# Files longer than this are truncated in the summary
+MAX_DISPLAY_CHARS = 50000
+
+# Files of at least this many bytes are streamed in chunks rather than read whole.
+# It is over 4 bytes x MAX_DISPLAY_CHARS, so every streamed file gets truncated.
+STREAM_READ_MIN_BYTES = 256 * 1024
+STREAM_CHUNK_CHARS = 64 * 1024
+
+# Below this many files, reading serially is cheaper than starting a thread pool
+PARALLEL_READ_MIN_FILES = 8
 
 # Map extensions to syntax highlighting languages
 EXT_TO_LANG = {
@@ -76,7 +105,56 @@ ENTRY_POINT_PATTERNS = {
     ]
 }
 
+# Metadata role label for each entry point category, in precedence order
+ENTRY_ROLE_LABELS = (
+    ('main_entry', "**MAIN ENTRY POINT**"),
+    ('config_entry', "**CONFIGURATION**"),
+    ('startup_scripts', "**STARTUP SCRIPT**"),
+    ('api_routes', "**API/ROUTES**"),
+    ('other_important', "**BUILD/DEPLOY**"),
+)
+
+# Lowercased lookup sets for the filename matches in detect_entry_points
+_MAIN_FILES = frozenset(f.lower() for f in ENTRY_POINT_PATTERNS['main_files'])
+_CONFIG_FILES = frozenset(f.lower() for f in ENTRY_POINT_PATTERNS['config_files'])
+_STARTUP_SCRIPTS = frozenset(f.lower() for f in ENTRY_POINT_PATTERNS['startup_scripts'])
+_ROUTE_PATTERNS = ('route', 'controller', 'handler', 'endpoint')
+_OTHER_PATTERNS = ('makefile', 'jenkinsfile', 'dockerfile')
+# Each keyword list as one alternation
+_ROUTE_RE = re.compile('|'.join(_ROUTE_PATTERNS))
+_OTHER_RE = re.compile('|'.join(_OTHER_PATTERNS))
+
+# Order of criticality for configuration files
+CRITICAL_CONFIG_FILES = [
+    # Package/dependency management (highest priority)
+    'package.json', 'pom.xml', 'build.gradle', 'build.gradle.kts', 
+    'cargo.toml', 'go.mod', 'pyproject.toml', 'requirements.txt',
+    
+    # Docker and infrastructure
+    'docker-compose.yml', 'docker-compose.yaml', 'dockerfile', 'Dockerfile',
+    
+    # Main framework config
+    'next.config.js', 'vite.config.js', 'vite.config.ts', 'angular.json',
+    'tailwind.config.js', 'tailwind.config.ts',
+    
+    # Core language config
+    'tsconfig.json', 'jsconfig.json',
+    
+    # Environment and app settings
+    '.env.example', 'config.json', 'config.yaml', 'config.yml',
+    'appsettings.json', 'settings.json'
+]
+_CRITICAL_CONFIG_ORDER = [name.lower() for name in CRITICAL_CONFIG_FILES]
+_CRITICAL_CONFIG_NAMES = frozenset(_CRITICAL_CONFIG_ORDER)
+
+# Dependency manifests listed in the project overview
+DEPENDENCY_FILENAMES = frozenset((
+    'package.json', 'pom.xml', 'requirements.txt', 'build.gradle',
+    'pyproject.toml', 'go.mod', 'cargo.toml', 'pubspec.yaml'
+))
+
 # Configuration and framework detection files
+# Matched case-insensitively, so each filename is listed once in one spelling
 CONFIG_FILE_PATTERNS = {
     # Build/Package Management
     'package.json': 'npm/Node.js configuration',
@@ -88,7 +166,7 @@ CONFIG_FILE_PATTERNS = {
     'pyproject.toml': 'Python project configuration',
     'requirements.txt': 'Python dependencies',
     'gemfile': 'Ruby dependencies',
-    'pubspec.yaml': 'Flutter/Dart configuration',
+    'pubspec.yaml': 'Flutter configuration',
     'composer.json': 'PHP dependencies',
     
     # Web Frameworks
@@ -134,7 +212,6 @@ CONFIG_FILE_PATTERNS = {
     'docker-compose.yml': 'Docker Compose configuration',
     'docker-compose.yaml': 'Docker Compose configuration',
     'dockerfile': 'Docker container configuration',
-    'Dockerfile': 'Docker container configuration',
     '.dockerignore': 'Docker ignore configuration',
     'terraform.tf': 'Terraform infrastructure',
     'main.tf': 'Terraform main configuration',
@@ -177,7 +254,6 @@ CONFIG_FILE_PATTERNS = {
     'sequelize.config.js': 'Sequelize configuration',
     
     # Mobile
-    'pubspec.yaml': 'Flutter configuration',
     'android/build.gradle': 'Android build configuration',
     'ios/Podfile': 'iOS CocoaPods configuration',
     'react-native.config.js': 'React Native configuration',
@@ -194,7 +270,6 @@ CONFIG_FILE_PATTERNS = {
     
     # Other
     'makefile': 'Build automation',
-    'Makefile': 'Build automation',
     'CMakeLists.txt': 'CMake build configuration',
     'configure.ac': 'Autotools configuration',
     'setup.py': 'Python package setup',
@@ -205,13 +280,37 @@ CONFIG_FILE_PATTERNS = {
     '.gitignore': 'Git ignore configuration',
     '.gitattributes': 'Git attributes configuration',
     'README.md': 'Project documentation',
-    'readme.md': 'Project documentation',
     'README.rst': 'Project documentation',
     'CHANGELOG.md': 'Project changelog',
     'LICENSE': 'License file',
     'LICENSE.md': 'License file',
 }
 
+def _split_config_patterns(patterns):
+    """
+    Split CONFIG_FILE_PATTERNS by kind, tagging each with its position:
+    exact lowercased filenames -> (order, description), wildcard patterns
+    as (order, prefix, suffix, description), directory patterns as
+    (order, fragment, description).
+    """
+    exact, wildcards, dirs = {}, [], []
+    for order, (pattern, description) in enumerate(patterns.items()):
+        pattern_lower = pattern.lower()
+        # Handle wildcard patterns like .github/workflows/*.yml
+        if '*' in pattern_lower:
+            pattern_parts = pattern_lower.split('*')
+            if len(pattern_parts) == 2:
+                wildcards.append((order, pattern_parts[0], pattern_parts[1], description))
+        # Handle directory patterns like .idea/
+        elif pattern_lower.endswith('/'):
+            dirs.append((order, pattern_lower[:-1], description))
+        # Exact filename matches; the earliest spelling wins
+        else:
+            exact.setdefault(pattern_lower, (order, description))
+    return exact, wildcards, dirs
+
+_CONFIG_EXACT, _CONFIG_WILDCARDS, _CONFIG_DIRS = _split_config_patterns(CONFIG_FILE_PATTERNS)
+
 AUTO_IGNORE_PATTERNS = [
     # IDE and editor files (from your ignore file)
     '.idea/',
@@ -274,6 +373,48 @@ AUTO_IGNORE_PATTERNS = [
     'terraform.tfstate.backup',
 ]
 
+# AUTO_IGNORE_PATTERNS split by kind for should_auto_ignore: 'name/' matches any
+# path component, '*.ext' any path ending in .ext, anything else the final component
+_AUTO_IGNORE_DIRS = frozenset(p[:-1] for p in AUTO_IGNORE_PATTERNS if p.endswith('/'))
+_AUTO_IGNORE_SUFFIXES = tuple(p[1:] for p in AUTO_IGNORE_PATTERNS if p.startswith('*.'))
+_AUTO_IGNORE_FILES = frozenset(
+    p for p in AUTO_IGNORE_PATTERNS if not p.endswith('/') and not p.startswith('*.')
+)
+# Everything a single path component can be auto-ignored by, for the walk,
+# where a file's directories have already been checked
+_AUTO_IGNORE_NAMES = _AUTO_IGNORE_DIRS | _AUTO_IGNORE_FILES
+
+
+def _lowered_paths(files):
+    """
+    Pair each relative path with its lowercased form and lowercased filename,
+    so the detectors below share one round of string work per file.
+    """
+    lowered = []
+    for file_path in files:
+        # Relative paths always use '/' separators
+        fp_lower = file_path.lower()
+        lowered.append((file_path, fp_lower, fp_lower[fp_lower.rfind('/') + 1:]))
+    return lowered
+
+def _entry_point_category(fp_lower, filename):
+    """Entry point category key for a lowercased path and filename, or None."""
+    # Direct filename matches
+    if filename in _MAIN_FILES:
+        return 'main_entry'
+    if filename in _CONFIG_FILES:
+        return 'config_entry'
+    if filename in _STARTUP_SCRIPTS:
+        return 'startup_scripts'
+    
+    # Pattern-based detection for routes/controllers
+    if _ROUTE_RE.search(fp_lower):
+        return 'api_routes'
+    
+    # Other important patterns
+    if _OTHER_RE.search(filename):
+        return 'other_important'
+    return None
 
 def detect_entry_points(files):
     """
@@ -288,24 +429,10 @@ def detect_entry_points(files):
         'other_important': []
     }
     
-    for file_path in files:
-        filename = os.path.basename(file_path).lower()
-        
-        # Direct filename matches
-        if filename in [f.lower() for f in ENTRY_POINT_PATTERNS['main_files']]:
-            entry_points['main_entry'].append(file_path)
-        elif filename in [f.lower() for f in ENTRY_POINT_PATTERNS['config_files']]:
-            entry_points['config_entry'].append(file_path)
-        elif filename in [f.lower() for f in ENTRY_POINT_PATTERNS['startup_scripts']]:
-            entry_points['startup_scripts'].append(file_path)
-        
-        # Pattern-based detection for routes/controllers
-        elif any(pattern in file_path.lower() for pattern in ['route', 'controller', 'handler', 'endpoint']):
-            entry_points['api_routes'].append(file_path)
-        
-        # Other important patterns
-        elif any(pattern in filename for pattern in ['makefile', 'jenkinsfile', 'dockerfile']):
-            entry_points['other_important'].append(file_path)
+    for file_path, fp_lower, filename in _lowered_paths(files):
+        category = _entry_point_category(fp_lower, filename)
+        if category:
+            entry_points[category].append(file_path)
     
     return entry_points
 
@@ -355,8 +482,31 @@ def analyze_file_content_for_entry_patterns(file_path, content):
 def prioritize_files(files, base_path):
     """
     Prioritize files for consumption - most important context first.
+    Returns (prioritized files, entry points, configuration files), where the
+    last two are what detect_entry_points and detect_critical_config_files +
+    detect_other_config_files would return.
     """
-    entry_points = detect_entry_points(files)
+    entry_points = {
+        'main_entry': [],
+        'config_entry': [],
+        'startup_scripts': [],
+        'api_routes': [],
+        'other_important': []
+    }
+    # Classify every file in one pass. A file is a critical config file if it
+    # is the first with a critical filename; every other file with a config
+    # pattern is an "other" config file.
+    first_by_name = {}
+    other_config = []
+    for file_path, fp_lower, filename in _lowered_paths(files):
+        category = _entry_point_category(fp_lower, filename)
+        if category:
+            entry_points[category].append(file_path)
+        if filename in _CRITICAL_CONFIG_NAMES and filename not in first_by_name:
+            first_by_name[filename] = file_path
+        elif _describe_config_file(fp_lower, filename) is not None:
+            other_config.append(file_path)
+    critical_config = [first_by_name[name] for name in _CRITICAL_CONFIG_ORDER if name in first_by_name]
     
     # Priority order for understanding:
     prioritized = []
@@ -365,11 +515,9 @@ def prioritize_files(files, base_path):
     prioritized.extend(entry_points['main_entry'])
     
     # 2. Critical configuration files - these show how the system is set up
-    critical_config = detect_critical_config_files(files)
     prioritized.extend(critical_config)
     
     # 3. Other configuration files - framework setup, environment config
-    other_config = detect_other_config_files(files, critical_config)
     prioritized.extend(other_config)
     
     # 4. Startup scripts - these show deployment/running procedures  
@@ -382,109 +530,60 @@ def prioritize_files(files, base_path):
     prioritized.extend(entry_points['other_important'])
     
     # 7. Remaining files, sorted alphabetically
-    remaining = [f for f in files if f not in prioritized]
+    prioritized_set = set(prioritized)
+    remaining = [f for f in files if f not in prioritized_set]
     prioritized.extend(sorted(remaining))
     
-    return prioritized, entry_points
+    return prioritized, entry_points, critical_config + other_config
 
 def detect_critical_config_files(files):
     """
     Detect critical configuration files that should appear very early.
     These are the most important for understanding project setup.
     """
-    critical_files = []
+    # First file (in walk order) carrying each lowercased filename, so every
+    # pattern is one dict lookup rather than a scan over all files
+    first_by_name = {}
+    for file_path, _, filename in _lowered_paths(files):
+        first_by_name.setdefault(filename, file_path)
     
-    # Order of criticality for configuration files
-    critical_patterns = [
-        # Package/dependency management (highest priority)
-        'package.json', 'pom.xml', 'build.gradle', 'build.gradle.kts', 
-        'cargo.toml', 'go.mod', 'pyproject.toml', 'requirements.txt',
-        
-        # Docker and infrastructure
-        'docker-compose.yml', 'docker-compose.yaml', 'dockerfile', 'Dockerfile',
-        
-        # Main framework config
-        'next.config.js', 'vite.config.js', 'vite.config.ts', 'angular.json',
-        'tailwind.config.js', 'tailwind.config.ts',
-        
-        # Core language config
-        'tsconfig.json', 'jsconfig.json',
-        
-        # Environment and app settings
-        '.env.example', 'config.json', 'config.yaml', 'config.yml',
-        'appsettings.json', 'settings.json'
-    ]
-    
-    for pattern in critical_patterns:
-        for file_path in files:
-            filename = os.path.basename(file_path).lower()
-            if filename == pattern.lower():
-                critical_files.append(file_path)
-                break
-    
-    return critical_files
+    return [first_by_name[pattern] for pattern in _CRITICAL_CONFIG_ORDER if pattern in first_by_name]
 
 def detect_other_config_files(files, already_added):
     """
     Detect other configuration files that should appear before core code.
     """
-    config_files = []
-    
-    for file_path in files:
-        if file_path in already_added:
-            continue
-            
-        filename = os.path.basename(file_path).lower()
-        filepath_lower = file_path.lower()
-        
-        # Check against our comprehensive config patterns
-        for pattern, description in CONFIG_FILE_PATTERNS.items():
-            pattern_lower = pattern.lower()
-            
-            # Handle wildcard patterns like .github/workflows/*.yml
-            if '*' in pattern_lower:
-                pattern_parts = pattern_lower.split('*')
-                if (len(pattern_parts) == 2 and 
-                    filepath_lower.startswith(pattern_parts[0]) and 
-                    filepath_lower.endswith(pattern_parts[1])):
-                    config_files.append(file_path)
-                    break
-            # Handle directory patterns like .idea/
-            elif pattern_lower.endswith('/'):
-                if pattern_lower[:-1] in filepath_lower:
-                    config_files.append(file_path)
-                    break
-            # Handle exact filename matches
-            elif filename == pattern_lower:
-                config_files.append(file_path)
-                break
-    
-    return config_files
+    already_added = set(already_added)
+    return [file_path for file_path, fp_lower, filename in _lowered_paths(files)
+            if file_path not in already_added and _describe_config_file(fp_lower, filename) is not None]
 
 def get_config_file_description(file_path):
     """
     Get a description of what a configuration file does.
     """
-    filename = os.path.basename(file_path).lower()
     filepath_lower = file_path.lower()
+    return _describe_config_file(filepath_lower, filepath_lower[filepath_lower.rfind('/') + 1:])
+
+def _describe_config_file(filepath_lower, filename):
+    """get_config_file_description for an already lowercased path and filename."""
+    # The first pattern in CONFIG_FILE_PATTERNS order wins. Exact filenames
+    # are one dict lookup; the few wildcard/directory patterns are scanned
+    # only while they come earlier than that hit.
+    best = _CONFIG_EXACT.get(filename)
+    for order, prefix, suffix, description in _CONFIG_WILDCARDS:
+        if best is not None and order > best[0]:
+            break
+        if filepath_lower.startswith(prefix) and filepath_lower.endswith(suffix):
+            best = (order, description)
+            break
+    for order, fragment, description in _CONFIG_DIRS:
+        if best is not None and order > best[0]:
+            break
+        if fragment in filepath_lower:
+            best = (order, description)
+            break
     
-    # Check exact matches first
-    for pattern, description in CONFIG_FILE_PATTERNS.items():
-        pattern_lower = pattern.lower()
-        
-        if '*' in pattern_lower:
-            pattern_parts = pattern_lower.split('*')
-            if (len(pattern_parts) == 2 and 
-                filepath_lower.startswith(pattern_parts[0]) and 
-                filepath_lower.endswith(pattern_parts[1])):
-                return description
-        elif pattern_lower.endswith('/'):
-            if pattern_lower[:-1] in filepath_lower:
-                return description
-        elif filename == pattern_lower:
-            return description
-    
-    return None
+    return best[1] if best is not None else None
 
 def analyze_dependencies(files, base_path):
     """
@@ -501,60 +600,27 @@ def analyze_dependencies(files, base_path):
         'key_files': []
     }
     
+    # Full paths by string concatenation onto the base directory
+    base_prefix = os.path.join(str(base_path), '')
+    sep = os.sep
     for file_path in files:
         filename = os.path.basename(file_path).lower()
-        file_full_path = base_path / file_path
+        file_full_path = base_prefix + (file_path if sep == '/' else file_path.replace('/', sep))
         
-        # Package managers and dependency files
-        if filename == 'package.json':
-            analyze_package_json(file_full_path, analysis)
-        elif filename == 'pom.xml':
-            analyze_maven_pom(file_full_path, analysis)
-        elif filename in ('build.gradle', 'build.gradle.kts'):
-            analyze_gradle(file_full_path, analysis)
-        elif filename == 'requirements.txt':
-            analyze_requirements_txt(file_full_path, analysis)
-        elif filename == 'pyproject.toml':
-            analyze_pyproject_toml(file_full_path, analysis)
-        elif filename == 'cargo.toml':
-            analyze_cargo_toml(file_full_path, analysis)
-        elif filename == 'go.mod':
-            analyze_go_mod(file_full_path, analysis)
-        elif filename in ('*.csproj', '*.fsproj', '*.vbproj') or file_path.endswith(('.csproj', '.fsproj', '.vbproj')):
+        # Package managers and dependency files: one lookup finds the parser
+        handler = _DEP_DISPATCH.get(filename)
+        if handler:
+            handler(file_full_path, analysis)
+        elif file_path.endswith(('.csproj', '.fsproj', '.vbproj')):
             analyze_dotnet_project(file_full_path, analysis)
-        elif filename == 'packages.config':
-            analyze_nuget_packages(file_full_path, analysis)
-        elif filename == 'gemfile':
-            analyze_gemfile(file_full_path, analysis)
-        elif filename == 'pubspec.yaml':
-            analyze_flutter_pubspec(file_full_path, analysis)
-        elif filename in ('podfile', 'package.swift'):
-            analyze_ios_dependencies(file_full_path, analysis, filename)
-        elif filename == 'cmakelists.txt':
-            analyze_cmake(file_full_path, analysis)
-        elif filename == 'makefile':
-            analyze_makefile(file_full_path, analysis)
-        elif filename in ('next.config.js', 'next.config.mjs', 'next.config.ts'):
-            analysis['frameworks'].add('Next.js')
-            analysis['project_types'].add('Frontend')
-            analysis['key_files'].append(file_path)
-        elif filename in ('nuxt.config.js', 'nuxt.config.ts'):
-            analysis['frameworks'].add('Nuxt.js')
-            analysis['project_types'].add('Frontend')
-        elif filename == 'angular.json':
-            analysis['frameworks'].add('Angular')
-            analysis['project_types'].add('Frontend')
-        elif filename in ('vue.config.js', 'vite.config.js', 'vite.config.ts'):
-            analysis['frameworks'].add('Vue.js')
-            analysis['project_types'].add('Frontend')
-        elif filename in ('svelte.config.js', 'svelte.config.mjs'):
-            analysis['frameworks'].add('Svelte')
-            analysis['project_types'].add('Frontend')
-        elif filename == 'webpack.config.js':
-            analysis['build_tools'].add('Webpack')
-        elif filename in ('docker-compose.yml', 'docker-compose.yaml', 'dockerfile'):
-            analysis['frameworks'].add('Docker')
-            analysis['key_files'].append(file_path)
+        elif filename in _EXACT_FW_TAGS:
+            # Framework/tool markers recognised by name alone, without parsing
+            group, name, project_type, is_key_file = _EXACT_FW_TAGS[filename]
+            analysis[group].add(name)
+            if project_type:
+                analysis['project_types'].add(project_type)
+            if is_key_file:
+                analysis['key_files'].append(file_path)
         elif filename in ('terraform.tf', 'main.tf') or file_path.endswith('.tf'):
             analysis['frameworks'].add('Terraform')
             analysis['project_types'].add('Infrastructure')
@@ -570,6 +636,39 @@ def analyze_dependencies(files, base_path):
     
     return analysis
 
+def _detect_frameworks(dep_names, framework_patterns, analysis, lowercase=False):
+    """
+    Add every framework whose pattern is a substring of some dependency name.
+    The names are joined with '\n', which no pattern contains, so a pattern
+    found in the joined string lies within a single name.
+    """
+    haystack = '\n'.join(dep_names)
+    if lowercase:
+        haystack = haystack.lower()
+    for pattern, framework in framework_patterns.items():
+        if pattern in haystack:
+            analysis['frameworks'].add(framework)
+
+# package.json dependency name fragment -> framework
+_NPM_FRAMEWORKS = {
+    'react': 'React',
+    'next': 'Next.js',
+    'vue': 'Vue.js',
+    'nuxt': 'Nuxt.js',
+    'angular': 'Angular',
+    'svelte': 'Svelte',
+    'express': 'Express.js',
+    'fastify': 'Fastify',
+    'nest': 'NestJS',
+    'gatsby': 'Gatsby',
+    'remix': 'Remix',
+    'electron': 'Electron',
+    'react-native': 'React Native',
+    'expo': 'Expo',
+    'ionic': 'Ionic',
+    'typescript': 'TypeScript'
+}
+
 def analyze_package_json(file_path, analysis):
     """Parse package.json for Node.js/frontend dependencies"""
     try:
@@ -578,7 +677,7 @@ def analyze_package_json(file_path, analysis):
         
         analysis['package_managers'].add('npm/yarn')
         analysis['languages'].add('JavaScript')
-        analysis['key_files'].append(str(file_path.name))
+        analysis['key_files'].append(os.path.basename(file_path))
         
         # Combine dependencies
         all_deps = {}
@@ -587,28 +686,7 @@ def analyze_package_json(file_path, analysis):
         analysis['dependencies']['npm'] = all_deps
         
         # Framework detection
-        frameworks_map = {
-            'react': 'React',
-            'next': 'Next.js',
-            'vue': 'Vue.js',
-            'nuxt': 'Nuxt.js',
-            'angular': 'Angular',
-            'svelte': 'Svelte',
-            'express': 'Express.js',
-            'fastify': 'Fastify',
-            'nest': 'NestJS',
-            'gatsby': 'Gatsby',
-            'remix': 'Remix',
-            'electron': 'Electron',
-            'react-native': 'React Native',
-            'expo': 'Expo',
-            'ionic': 'Ionic',
-            'typescript': 'TypeScript'
-        }
-        
-        for dep_name, framework in frameworks_map.items():
-            if any(dep_name in dep.lower() for dep in all_deps.keys()):
-                analysis['frameworks'].add(framework)
+        _detect_frameworks(all_deps, _NPM_FRAMEWORKS, analysis, lowercase=True)
         
         # Project type detection
         if any(dep in all_deps for dep in ['react-native', 'expo']):
@@ -621,48 +699,61 @@ def analyze_package_json(file_path, analysis):
     except (json.JSONDecodeError, FileNotFoundError, UnicodeDecodeError):
         pass
 
+# groupId:artifactId fragment -> framework
+_MAVEN_FRAMEWORKS = {
+    'spring': 'Spring Framework',
+    'spring-boot': 'Spring Boot',
+    'quarkus': 'Quarkus',
+    'micronaut': 'Micronaut',
+    'junit': 'JUnit',
+    'hibernate': 'Hibernate',
+    'jackson': 'Jackson',
+    'apache-kafka': 'Apache Kafka',
+    'vertx': 'Vert.x'
+}
+
 def analyze_maven_pom(file_path, analysis):
     """Parse Maven pom.xml for Java dependencies"""
     try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+        # Stream the document: each <dependency> is read and cleared when it
+        # ends, and each finished top-level section (<dependencies>, <build>,
+        # <properties>, ...) is detached from the root, so only the section
+        # being parsed is held in memory
+        root = None
+        depth = 0
+        deps = {}
+        for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if root is None:
+                    root = elem
+                    # Handle XML namespaces
+                    ns = '{http://maven.apache.org/POM/4.0.0}' if 'maven.apache.org' in str(root.tag) else ''
+                    dependency_tag = ns + 'dependency'
+                continue
+            depth -= 1
+            
+            if elem.tag == dependency_tag and elem is not root:
+                group_id = elem.find(ns + 'groupId')
+                artifact_id = elem.find(ns + 'artifactId')
+                version = elem.find(ns + 'version')
+                
+                if group_id is not None and artifact_id is not None:
+                    key = f"{group_id.text}:{artifact_id.text}"
+                    deps[key] = version.text if version is not None else "unknown"
+                elem.clear()
+            
+            if depth == 1:
+                root.remove(elem)
         
         analysis['package_managers'].add('Maven')
         analysis['languages'].add('Java')
         analysis['key_files'].append('pom.xml')
         
-        # Handle XML namespaces
-        ns = {'m': 'http://maven.apache.org/POM/4.0.0'} if 'maven.apache.org' in str(root.tag) else {}
-        
-        deps = {}
-        for dep in root.findall('.//dependency' if not ns else './/m:dependency', ns):
-            group_id = dep.find('groupId' if not ns else 'm:groupId', ns)
-            artifact_id = dep.find('artifactId' if not ns else 'm:artifactId', ns)
-            version = dep.find('version' if not ns else 'm:version', ns)
-            
-            if group_id is not None and artifact_id is not None:
-                key = f"{group_id.text}:{artifact_id.text}"
-                deps[key] = version.text if version is not None else "unknown"
-        
         analysis['dependencies']['maven'] = deps
         
         # Framework detection
-        framework_patterns = {
-            'spring': 'Spring Framework',
-            'spring-boot': 'Spring Boot',
-            'quarkus': 'Quarkus',
-            'micronaut': 'Micronaut',
-            'junit': 'JUnit',
-            'hibernate': 'Hibernate',
-            'jackson': 'Jackson',
-            'apache-kafka': 'Apache Kafka',
-            'vertx': 'Vert.x'
-        }
-        
-        for dep_key in deps.keys():
-            for pattern, framework in framework_patterns.items():
-                if pattern in dep_key.lower():
-                    analysis['frameworks'].add(framework)
+        _detect_frameworks(deps, _MAVEN_FRAMEWORKS, analysis, lowercase=True)
         
         analysis['project_types'].add('Java Application')
         
@@ -678,7 +769,7 @@ def analyze_gradle(file_path, analysis):
         analysis['package_managers'].add('Gradle')
         analysis['build_tools'].add('Gradle')
         
-        if file_path.name.endswith('.kts'):
+        if file_path.endswith('.kts'):
             analysis['languages'].add('Kotlin')
         else:
             analysis['languages'].add('Groovy')
@@ -697,50 +788,50 @@ def analyze_gradle(file_path, analysis):
     except (FileNotFoundError, UnicodeDecodeError):
         pass
 
+# requirements.txt package name fragment -> framework
+_PIP_FRAMEWORKS = {
+    'django': 'Django',
+    'flask': 'Flask',
+    'fastapi': 'FastAPI',
+    'tornado': 'Tornado',
+    'pyramid': 'Pyramid',
+    'celery': 'Celery',
+    'pandas': 'Pandas',
+    'numpy': 'NumPy',
+    'tensorflow': 'TensorFlow',
+    'pytorch': 'PyTorch',
+    'scikit-learn': 'Scikit-learn',
+    'requests': 'Requests',
+    'sqlalchemy': 'SQLAlchemy'
+}
+
+# Requirement specifiers like 'package==1.0.0' or 'package>=1.0.0'
+_REQ_LINE_RE = re.compile(r'^([a-zA-Z0-9\-_\.]+)([><=!]+.*)?')
+
 def analyze_requirements_txt(file_path, analysis):
     """Parse Python requirements.txt"""
     try:
+        # Parse line by line as the file streams in, without a readlines() copy
+        deps = {}
         with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    # Handle requirements like 'package==1.0.0' or 'package>=1.0.0'
+                    match = _REQ_LINE_RE.match(line)
+                    if match:
+                        pkg_name = match.group(1).lower()
+                        version = match.group(2) if match.group(2) else ""
+                        deps[pkg_name] = version
         
         analysis['package_managers'].add('pip')
         analysis['languages'].add('Python')
         analysis['key_files'].append('requirements.txt')
         
-        deps = {}
-        for line in lines:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                # Handle requirements like 'package==1.0.0' or 'package>=1.0.0'
-                match = re.match(r'^([a-zA-Z0-9\-_\.]+)([><=!]+.*)?', line)
-                if match:
-                    pkg_name = match.group(1).lower()
-                    version = match.group(2) if match.group(2) else ""
-                    deps[pkg_name] = version
-        
         analysis['dependencies']['pip'] = deps
         
         # Framework detection
-        framework_patterns = {
-            'django': 'Django',
-            'flask': 'Flask',
-            'fastapi': 'FastAPI',
-            'tornado': 'Tornado',
-            'pyramid': 'Pyramid',
-            'celery': 'Celery',
-            'pandas': 'Pandas',
-            'numpy': 'NumPy',
-            'tensorflow': 'TensorFlow',
-            'pytorch': 'PyTorch',
-            'scikit-learn': 'Scikit-learn',
-            'requests': 'Requests',
-            'sqlalchemy': 'SQLAlchemy'
-        }
-        
-        for dep_name in deps.keys():
-            for pattern, framework in framework_patterns.items():
-                if pattern in dep_name:
-                    analysis['frameworks'].add(framework)
+        _detect_frameworks(deps, _PIP_FRAMEWORKS, analysis)
         
         # Project type detection
         if any(fw in analysis['frameworks'] for fw in ['Django', 'Flask', 'FastAPI']):
@@ -753,13 +844,8 @@ def analyze_requirements_txt(file_path, analysis):
 
 def analyze_pyproject_toml(file_path, analysis):
     """Parse Python pyproject.toml"""
-    try:
-        import tomli
-    except ImportError:
-        try:
-            import tomllib as tomli
-        except ImportError:
-            return
+    if tomli is None:
+        return
     
     try:
         with open(file_path, 'rb') as f:
@@ -778,15 +864,21 @@ def analyze_pyproject_toml(file_path, analysis):
     except (FileNotFoundError, UnicodeDecodeError):
         pass
 
+# Cargo dependency name fragment -> framework
+_CARGO_FRAMEWORKS = {
+    'actix-web': 'Actix Web',
+    'warp': 'Warp',
+    'rocket': 'Rocket',
+    'axum': 'Axum',
+    'tokio': 'Tokio',
+    'serde': 'Serde',
+    'diesel': 'Diesel'
+}
+
 def analyze_cargo_toml(file_path, analysis):
     """Parse Rust Cargo.toml"""
-    try:
-        import tomli
-    except ImportError:
-        try:
-            import tomllib as tomli
-        except ImportError:
-            return
+    if tomli is None:
+        return
     
     try:
         with open(file_path, 'rb') as f:
@@ -801,24 +893,26 @@ def analyze_cargo_toml(file_path, analysis):
         analysis['dependencies']['cargo'] = deps
         
         # Framework detection
-        framework_patterns = {
-            'actix-web': 'Actix Web',
-            'warp': 'Warp',
-            'rocket': 'Rocket',
-            'axum': 'Axum',
-            'tokio': 'Tokio',
-            'serde': 'Serde',
-            'diesel': 'Diesel'
-        }
-        
-        for dep_name in deps.keys():
-            for pattern, framework in framework_patterns.items():
-                if pattern in dep_name:
-                    analysis['frameworks'].add(framework)
+        _detect_frameworks(deps, _CARGO_FRAMEWORKS, analysis)
                     
     except (FileNotFoundError, UnicodeDecodeError):
         pass
 
+# 'require <module> <version>' or a bare '<module> <version>' line of a require
+# block. When the 'require' form can't match, the optional prefix backtracks
+# away and the bare form is tried, in a single match call.
+_GO_REQUIRE_RE = re.compile(r'(?:require\s+)?([^\s]+)\s+([^\s]+)')
+
+# Go module path fragment -> framework
+_GO_FRAMEWORKS = {
+    'gin-gonic/gin': 'Gin',
+    'gorilla/mux': 'Gorilla Mux',
+    'echo': 'Echo',
+    'fiber': 'Fiber',
+    'kubernetes': 'Kubernetes',
+    'grpc': 'gRPC'
+}
+
 def analyze_go_mod(file_path, analysis):
     """Parse Go go.mod file"""
     try:
@@ -843,77 +937,76 @@ def analyze_go_mod(file_path, analysis):
                 continue
             elif in_require_block or line.startswith('require '):
                 # Parse require statements
-                match = re.match(r'require\s+([^\s]+)\s+([^\s]+)', line) or re.match(r'([^\s]+)\s+([^\s]+)', line)
+                match = _GO_REQUIRE_RE.match(line)
                 if match:
                     deps[match.group(1)] = match.group(2)
         
         analysis['dependencies']['go'] = deps
         
         # Framework detection
-        framework_patterns = {
-            'gin-gonic/gin': 'Gin',
-            'gorilla/mux': 'Gorilla Mux',
-            'echo': 'Echo',
-            'fiber': 'Fiber',
-            'kubernetes': 'Kubernetes',
-            'grpc': 'gRPC'
-        }
-        
-        for dep_name in deps.keys():
-            for pattern, framework in framework_patterns.items():
-                if pattern in dep_name:
-                    analysis['frameworks'].add(framework)
+        _detect_frameworks(deps, _GO_FRAMEWORKS, analysis)
                     
     except (FileNotFoundError, UnicodeDecodeError):
         pass
 
+def _iter_xml_descendants(file_path, tag):
+    """
+    Stream an XML file and yield the elements below the root whose tag is
+    exactly tag, in document order (like root.iter/findall('.//tag')). Only
+    their attributes are available; each element is cleared once it has been
+    fully parsed.
+    Raises ET.ParseError for malformed documents, as ET.parse does.
+    """
+    root = None
+    for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            elif elem.tag == tag:
+                yield elem
+        elif elem is not root:
+            elem.clear()
+
+# PackageReference name fragment -> framework
+_DOTNET_FRAMEWORKS = {
+    'Microsoft.AspNetCore': 'ASP.NET Core',
+    'Microsoft.EntityFrameworkCore': 'Entity Framework Core',
+    'Xamarin': 'Xamarin',
+    'Microsoft.Maui': 'MAUI',
+    'Blazor': 'Blazor'
+}
+
 def analyze_dotnet_project(file_path, analysis):
     """Parse .NET project files (.csproj, .fsproj, .vbproj)"""
     try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        
-        analysis['package_managers'].add('NuGet')
-        analysis['languages'].add('C#/.NET')
-        analysis['project_types'].add('.NET Application')
-        
         # Extract package references
         deps = {}
-        for pkg_ref in root.findall('.//PackageReference'):
+        for pkg_ref in _iter_xml_descendants(file_path, 'PackageReference'):
             include = pkg_ref.get('Include')
             version = pkg_ref.get('Version')
             if include:
                 deps[include] = version or "unknown"
         
+        analysis['package_managers'].add('NuGet')
+        analysis['languages'].add('C#/.NET')
+        analysis['project_types'].add('.NET Application')
+        
         analysis['dependencies']['nuget'] = deps
         
         # Framework detection
-        framework_patterns = {
-            'Microsoft.AspNetCore': 'ASP.NET Core',
-            'Microsoft.EntityFrameworkCore': 'Entity Framework Core',
-            'Xamarin': 'Xamarin',
-            'Microsoft.Maui': 'MAUI',
-            'Blazor': 'Blazor'
-        }
-        
-        for dep_name in deps.keys():
-            for pattern, framework in framework_patterns.items():
-                if pattern in dep_name:
-                    analysis['frameworks'].add(framework)
+        _detect_frameworks(deps, _DOTNET_FRAMEWORKS, analysis)
                     
     except (ET.ParseError, FileNotFoundError, UnicodeDecodeError):
         pass
 
 def analyze_flutter_pubspec(file_path, analysis):
     """Parse Flutter pubspec.yaml"""
-    try:
-        import yaml
-    except ImportError:
+    if yaml is None:
         return
     
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=_YAML_LOADER)
         
         analysis['frameworks'].add('Flutter')
         analysis['languages'].add('Dart')
@@ -946,42 +1039,51 @@ def analyze_makefile(file_path, analysis):
     """Parse Makefile"""
     analysis['build_tools'].add('Make')
     
+# packages.config package id fragment -> framework
+_NUGET_FRAMEWORKS = {
+    'Microsoft.AspNetCore': 'ASP.NET Core',
+    'Microsoft.EntityFrameworkCore': 'Entity Framework Core',
+    'Newtonsoft.Json': 'JSON.NET',
+    'NUnit': 'NUnit',
+    'xunit': 'xUnit'
+}
+
 def analyze_nuget_packages(file_path, analysis):
     """Parse .NET packages.config for NuGet dependencies"""
     try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        
-        analysis['package_managers'].add('NuGet')
-        analysis['languages'].add('C#/.NET')
-        analysis['key_files'].append('packages.config')
-        
         deps = {}
-        for package in root.findall('.//package'):
+        for package in _iter_xml_descendants(file_path, 'package'):
             package_id = package.get('id')
             version = package.get('version')
             if package_id:
                 deps[package_id] = version or "unknown"
         
-        analysis['dependencies']['nuget'] = deps
+        analysis['package_managers'].add('NuGet')
+        analysis['languages'].add('C#/.NET')
+        analysis['key_files'].append('packages.config')
         
-        # Framework detection (same as in analyze_dotnet_project)
-        framework_patterns = {
-            'Microsoft.AspNetCore': 'ASP.NET Core',
-            'Microsoft.EntityFrameworkCore': 'Entity Framework Core',
-            'Newtonsoft.Json': 'JSON.NET',
-            'NUnit': 'NUnit',
-            'xunit': 'xUnit'
-        }
+        analysis['dependencies']['nuget'] = deps
         
-        for dep_name in deps.keys():
-            for pattern, framework in framework_patterns.items():
-                if pattern in dep_name:
-                    analysis['frameworks'].add(framework)
+        # Framework detection
+        _detect_frameworks(deps, _NUGET_FRAMEWORKS, analysis)
                     
     except (ET.ParseError, FileNotFoundError, UnicodeDecodeError):
         pass
 
+# gem "name", "version" declarations in a Gemfile
+_GEM_RE = re.compile(r'gem\s+["\']([^"\']+)["\'](?:\s*,\s*["\']([^"\']+)["\'])?')
+
+# Gem name fragment -> framework
+_GEM_FRAMEWORKS = {
+    'rails': 'Ruby on Rails',
+    'sinatra': 'Sinatra',
+    'rack': 'Rack',
+    'rspec': 'RSpec',
+    'minitest': 'MiniTest',
+    'devise': 'Devise',
+    'activerecord': 'ActiveRecord'
+}
+
 def analyze_gemfile(file_path, analysis):
     """Parse Ruby Gemfile for gem dependencies"""
     try:
@@ -999,8 +1101,7 @@ def analyze_gemfile(file_path, analysis):
             line = line.strip()
             if line.startswith('gem '):
                 # Parse gem "name", "version" format
-                import re
-                match = re.match(r'gem\s+["\']([^"\']+)["\'](?:\s*,\s*["\']([^"\']+)["\'])?', line)
+                match = _GEM_RE.match(line)
                 if match:
                     gem_name = match.group(1)
                     version = match.group(2) if match.group(2) else "latest"
@@ -1009,20 +1110,7 @@ def analyze_gemfile(file_path, analysis):
         analysis['dependencies']['bundler'] = deps
         
         # Framework detection
-        framework_patterns = {
-            'rails': 'Ruby on Rails',
-            'sinatra': 'Sinatra',
-            'rack': 'Rack',
-            'rspec': 'RSpec',
-            'minitest': 'MiniTest',
-            'devise': 'Devise',
-            'activerecord': 'ActiveRecord'
-        }
-        
-        for dep_name in deps.keys():
-            for pattern, framework in framework_patterns.items():
-                if pattern in dep_name.lower():
-                    analysis['frameworks'].add(framework)
+        _detect_frameworks(deps, _GEM_FRAMEWORKS, analysis, lowercase=True)
         
         # Project type detection
         if 'rails' in analysis['frameworks']:
@@ -1031,6 +1119,45 @@ def analyze_gemfile(file_path, analysis):
     except (FileNotFoundError, UnicodeDecodeError):
         pass
 
+# Dependency manifest filename (lowercased) -> parser for analyze_dependencies
+_DEP_DISPATCH = {
+    'package.json': analyze_package_json,
+    'pom.xml': analyze_maven_pom,
+    'build.gradle': analyze_gradle,
+    'build.gradle.kts': analyze_gradle,
+    'requirements.txt': analyze_requirements_txt,
+    'pyproject.toml': analyze_pyproject_toml,
+    'cargo.toml': analyze_cargo_toml,
+    'go.mod': analyze_go_mod,
+    'packages.config': analyze_nuget_packages,
+    'gemfile': analyze_gemfile,
+    'pubspec.yaml': analyze_flutter_pubspec,
+    'podfile': lambda file_path, analysis: analyze_ios_dependencies(file_path, analysis, 'podfile'),
+    'package.swift': lambda file_path, analysis: analyze_ios_dependencies(file_path, analysis, 'package.swift'),
+    'cmakelists.txt': analyze_cmake,
+    'makefile': analyze_makefile,
+}
+
+# Marker filename (lowercased) -> (analysis set, name, project type or None,
+# whether to list the file under key files) for analyze_dependencies
+_EXACT_FW_TAGS = {
+    'next.config.js': ('frameworks', 'Next.js', 'Frontend', True),
+    'next.config.mjs': ('frameworks', 'Next.js', 'Frontend', True),
+    'next.config.ts': ('frameworks', 'Next.js', 'Frontend', True),
+    'nuxt.config.js': ('frameworks', 'Nuxt.js', 'Frontend', False),
+    'nuxt.config.ts': ('frameworks', 'Nuxt.js', 'Frontend', False),
+    'angular.json': ('frameworks', 'Angular', 'Frontend', False),
+    'vue.config.js': ('frameworks', 'Vue.js', 'Frontend', False),
+    'vite.config.js': ('frameworks', 'Vue.js', 'Frontend', False),
+    'vite.config.ts': ('frameworks', 'Vue.js', 'Frontend', False),
+    'svelte.config.js': ('frameworks', 'Svelte', 'Frontend', False),
+    'svelte.config.mjs': ('frameworks', 'Svelte', 'Frontend', False),
+    'webpack.config.js': ('build_tools', 'Webpack', None, False),
+    'docker-compose.yml': ('frameworks', 'Docker', None, True),
+    'docker-compose.yaml': ('frameworks', 'Docker', None, True),
+    'dockerfile': ('frameworks', 'Docker', None, True),
+}
+
 def detect_project_patterns(files, analysis):
     """Detect project types based on file patterns"""
     file_patterns = {
@@ -1053,37 +1180,37 @@ def format_dependency_summary(analysis):
     if not any([analysis['frameworks'], analysis['dependencies'], analysis['project_types']]):
         return ""
     
-    summary = "## Dependency Analysis & Tech Stack\n\n"
+    parts = ["## Dependency Analysis & Tech Stack\n\n"]
     
     if analysis['project_types']:
-        summary += f"**Project Type(s)**: {', '.join(sorted(analysis['project_types']))}\n"
+        parts += ["**Project Type(s)**: ", ', '.join(sorted(analysis['project_types'])), "\n"]
     
     if analysis['languages']:
-        summary += f"**Languages**: {', '.join(sorted(analysis['languages']))}\n"
+        parts += ["**Languages**: ", ', '.join(sorted(analysis['languages'])), "\n"]
     
     if analysis['frameworks']:
-        summary += f"**Frameworks/Libraries**: {', '.join(sorted(analysis['frameworks']))}\n"
+        parts += ["**Frameworks/Libraries**: ", ', '.join(sorted(analysis['frameworks'])), "\n"]
     
     if analysis['package_managers']:
-        summary += f"**Package Managers**: {', '.join(sorted(analysis['package_managers']))}\n"
+        parts += ["**Package Managers**: ", ', '.join(sorted(analysis['package_managers'])), "\n"]
     
     if analysis['build_tools']:
-        summary += f"**Build Tools**: {', '.join(sorted(analysis['build_tools']))}\n"
+        parts += ["**Build Tools**: ", ', '.join(sorted(analysis['build_tools'])), "\n"]
     
     # Key dependencies summary
     if analysis['dependencies']:
-        summary += f"**Key Dependencies**:\n"
+        parts.append("**Key Dependencies**:\n")
         for pm, deps in analysis['dependencies'].items():
             if deps:
-                key_deps = list(deps.keys())[:5]  # Show first 5 dependencies
+                key_deps = list(islice(deps, 5))  # Show first 5 dependencies
                 more_count = len(deps) - 5
-                summary += f"- {pm.title()}: {', '.join(key_deps)}"
+                parts += ["- ", pm.title(), ": ", ', '.join(key_deps)]
                 if more_count > 0:
-                    summary += f" (+{more_count} more)"
-                summary += "\n"
+                    parts.append(f" (+{more_count} more)")
+                parts.append("\n")
     
-    summary += "\n"
-    return summary
+    parts.append("\n")
+    return ''.join(parts)
     """
     Check if a markdown file has balanced triple backticks.
     Returns (is_valid, error_message).
@@ -1100,57 +1227,119 @@ def format_dependency_summary(analysis):
 def build_tree(files):
     """
     Build a hierarchical tree representation of file paths for TOC.
+    Paths are sorted so each directory lists its subdirectories before its
+    files, then emitted in linear passes - no nested dicts, no recursion.
     """
-    tree = defaultdict(dict)
-    for path in files:
-        parts = path.split('/')
-        current = tree
-        for part in parts[:-1]:
-            current = current.setdefault(part, defaultdict(dict))
-        current.setdefault('__files__', []).append(parts[-1])
-    
-    def print_tree(node, prefix=''):
-        lines = []
-        dirs = sorted(k for k in node if k != '__files__')
-        files = sorted(node.get('__files__', []))
-        items = dirs + files
-        for i, item in enumerate(items):
-            is_last = i == len(items) - 1
-            line_prefix = prefix + ('└── ' if is_last else '├── ')
-            lines.append(line_prefix + item)
-            if item in dirs:
-                new_prefix = prefix + ('    ' if is_last else '│   ')
-                lines.extend(print_tree(node[item], new_prefix))
-        return lines
-    
-    return '\n'.join(print_tree(tree))
-
-def smart_truncate_by_chars(content, file_path, max_chars=50000):
+    def tree_order(parts):
+        return [(0, part) for part in parts[:-1]] + [(1, parts[-1])]
+
+    # Flatten into (depth, name) rows in display order, opening each directory
+    # the first time a path leaves the previous path's directory prefix
+    nodes = []
+    prev_dirs = []
+    for parts in sorted((path.split('/') for path in files), key=tree_order):
+        dirs = parts[:-1]
+        common = 0
+        limit = min(len(prev_dirs), len(dirs))
+        while common < limit and prev_dirs[common] == dirs[common]:
+            common += 1
+        for depth in range(common, len(dirs)):
+            nodes.append((depth, dirs[depth]))
+        nodes.append((len(dirs), parts[-1]))
+        prev_dirs = dirs
+
+    # Walking backwards, a row is the last of its siblings unless another row
+    # at the same depth was seen before climbing back above it
+    is_last = [False] * len(nodes)
+    seen_at_depth = []
+    for i in range(len(nodes) - 1, -1, -1):
+        depth = nodes[i][0]
+        del seen_at_depth[depth + 1:]
+        if len(seen_at_depth) <= depth:
+            seen_at_depth.extend([False] * (depth + 1 - len(seen_at_depth)))
+        is_last[i] = not seen_at_depth[depth]
+        seen_at_depth[depth] = True
+
+    lines = []
+    prefixes = ['']
+    for (depth, name), last in zip(nodes, is_last):
+        prefix = prefixes[depth]
+        lines.append(prefix + ('└── ' if last else '├── ') + name)
+        del prefixes[depth + 1:]
+        prefixes.append(prefix + ('    ' if last else '│   '))
+    
+    return '\n'.join(lines)
+
+def smart_truncate_by_chars(content, file_path, max_chars=MAX_DISPLAY_CHARS, total_chars=None):
     """
     Truncate by character count for very large files only.
     Most source files under 50KB will not be truncated.
+    Pass total_chars when content is only the leading part of a streamed file.
     """
-    if len(content) <= max_chars:
+    if total_chars is None:
+        total_chars = len(content)
+    if total_chars <= max_chars:
         return content, False
     
-    # Find a good place to cut (try to end at a complete line)
-    truncate_point = max_chars
-    
-    # Look backwards for a newline within the last 500 chars
-    for i in range(max_chars, max(max_chars - 500, 0), -1):
-        if content[i] == '\n':
-            truncate_point = i
-            break
+    # Find a good place to cut (try to end at a complete line): the last
+    # newline within the last 500 chars
+    newline = content.rfind('\n', max(max_chars - 500, 0) + 1, max_chars + 1)
+    truncate_point = newline if newline != -1 else max_chars
     
     truncated_content = content[:truncate_point]
     truncated_content += '\n\n# <TRUNCATED>\n'
-    truncated_content += f'# Original file: {len(content):,} characters (~{len(content)//1000}KB)\n'
+    truncated_content += f'# Original file: {total_chars:,} characters (~{total_chars//1000}KB)\n'
     truncated_content += f'# Showing first: {truncate_point:,} characters (~{truncate_point//1000}KB)\n'
     truncated_content += '# Ask for the complete file if you need to see the rest\n'
     truncated_content += '# </TRUNCATED>'
     
     return truncated_content, True
 
+def read_file_for_summary(entry, relative_path):
+    """
+    Read one file (an os.DirEntry from the directory walk) for the summary output.
+    Returns (contents, was_truncated, line_count, file_size, error), where contents
+    is already truncated for display. Runs on worker threads, so failures are
+    returned rather than raised.
+    """
+    try:
+        with open(entry.path, 'rb') as f:
+            # Small file: read and decode in one go; the byte length is the file size
+            raw = f.read(STREAM_READ_MIN_BYTES)
+            if len(raw) < STREAM_READ_MIN_BYTES:
+                contents = raw.decode('utf-8')
+                if '\r' in contents:
+                    # Same newline translation text mode applied
+                    contents = contents.replace('\r\n', '\n').replace('\r', '\n')
+                # Lines, counting a final line without a trailing newline
+                line_count = contents.count('\n') + (1 if contents and not contents.endswith('\n') else 0)
+                contents, was_truncated = smart_truncate_by_chars(contents, relative_path)
+                return contents, was_truncated, line_count, len(raw), None
+
+            # Large file: stream it in chunks, keeping only the head that survives
+            # truncation, so memory stays bounded no matter how big the file is
+            f.seek(0)
+            text = io.TextIOWrapper(f, encoding='utf-8')
+            head_chars = MAX_DISPLAY_CHARS + 1
+            head = []
+            head_len = char_count = newline_count = 0
+            chunk = ''
+            while True:
+                prev_chunk, chunk = chunk, text.read(STREAM_CHUNK_CHARS)
+                if not chunk:
+                    break
+                char_count += len(chunk)
+                newline_count += chunk.count('\n')
+                if head_len < head_chars:
+                    head.append(chunk[:head_chars - head_len])
+                    head_len += len(head[-1])
+            line_count = newline_count + (0 if not prev_chunk or prev_chunk.endswith('\n') else 1)
+            file_size = os.fstat(f.fileno()).st_size
+            contents, was_truncated = smart_truncate_by_chars(''.join(head), relative_path, total_chars=char_count)
+            return contents, was_truncated, line_count, file_size, None
+    except Exception as e:
+        return None, False, None, None, e
+
 def should_auto_ignore(file_path):
     """
     Check if file should be automatically ignored.
@@ -1163,25 +1352,10 @@ def should_auto_ignore(file_path):
     """
     # Normalize path separators for cross-platform compatibility
     normalized_path = file_path.replace('\\', '/')
-    path_parts = normalized_path.split('/')
-    
-    for pattern in AUTO_IGNORE_PATTERNS:
-        if pattern.endswith('/'):
-            # Directory pattern - check if any part of the path matches
-            dir_name = pattern[:-1]  # Remove trailing slash
-            if dir_name in path_parts:
-                return True
-        elif pattern.startswith('*.'):
-            # Extension pattern
-            if normalized_path.endswith(pattern[1:]):
-                return True
-        else:
-            # Exact filename pattern
-            filename = path_parts[-1]  # Get just the filename
-            if filename == pattern:
-                return True
-    
-    return False
+    if normalized_path.endswith(_AUTO_IGNORE_SUFFIXES):
+        return True
+    parts = normalized_path.split('/')
+    return parts[-1] in _AUTO_IGNORE_FILES or not _AUTO_IGNORE_DIRS.isdisjoint(parts)
 
 def load_gitignore_patterns(base_path):
     """Load patterns from .gitignore if it exists"""
@@ -1237,6 +1411,130 @@ def matches_gitignore(file_path, gitignore_patterns):
             return True
     return False
 
+def compile_gitignore_matchers(gitignore_patterns):
+    """
+    Split matches_gitignore(path, gitignore_patterns) into two predicates for
+    the directory walk, each None when no pattern needs it:
+    - directory_ignored(relative_root) for directory patterns ('name/'), which
+      match a path component and so exclude a directory's whole subtree
+    - file_ignored(relative_path) for the remaining patterns, assuming every
+      ancestor directory already passed directory_ignored
+    The patterns are sorted by kind and compiled once.
+    """
+    import fnmatch
+    names = set()            # exact filename patterns
+    directories = []         # directory patterns
+    substrings = []          # exact patterns with a '/'
+    name_wildcards = []      # wildcard patterns matched against the filename
+    path_wildcards = []      # wildcard patterns matched against the whole path
+    for pattern in gitignore_patterns:
+        pattern = pattern.replace('\\', '/')
+        if pattern.endswith('/'):
+            # '/dir/' found in '/path': the pattern starts the path or follows a '/'
+            directories.append('(?:^|/)' + re.escape(pattern))
+        elif '*' in pattern:
+            regex = fnmatch.translate(os.path.normcase(pattern))
+            (path_wildcards if '/' in pattern else name_wildcards).append(regex)
+        elif '/' in pattern:
+            substrings.append(re.escape(pattern))
+        else:
+            names.add(pattern)
+
+    directory_re = re.compile('|'.join(directories)) if directories else None
+    # fnmatch.translate() output is anchored with \Z, so match() on the
+    # alternation means "some pattern matches the entire string"
+    substring_re = re.compile('|'.join(substrings)) if substrings else None
+    name_wildcard_re = re.compile('|'.join(name_wildcards)) if name_wildcards else None
+    path_wildcard_re = re.compile('|'.join(path_wildcards)) if path_wildcards else None
+    normcase = os.path.normcase
+
+    def directory_ignored(relative_root):
+        return directory_re.search(relative_root.replace('\\', '/')) is not None
+
+    def file_ignored(file_path):
+        file_path = file_path.replace('\\', '/')
+        filename = file_path[file_path.rfind('/') + 1:]
+        return (filename in names
+                or (substring_re is not None and substring_re.search(file_path) is not None)
+                or (name_wildcard_re is not None and name_wildcard_re.match(normcase(filename)) is not None)
+                or (path_wildcard_re is not None and path_wildcard_re.match(normcase(file_path)) is not None))
+
+    return (directory_ignored if directory_re is not None else None,
+            file_ignored if names or substrings or name_wildcards or path_wildcards else None)
+
+def compile_ignore_matcher(ignore_spec):
+    """
+    Build a predicate equivalent to ignore_spec.match_file. The positive
+    patterns are OR-ed into one regex; paths it matches only go through the
+    full PathSpec when negated patterns could re-include them.
+    """
+    # Per-pattern .regex/.include aren't public pathspec API: anything
+    # unexpected falls back to the spec's own matching
+    patterns = [p for p in getattr(ignore_spec, 'patterns', ()) if getattr(p, 'include', None) is not None]
+    if not patterns or not all(isinstance(getattr(p, 'regex', None), re.Pattern) for p in patterns):
+        return ignore_spec.match_file
+
+    # Each pattern reuses the same named group, which can't repeat in one regex
+    include_regexes = [re.sub(r'\(\?P<\w+>', '(?:', p.regex.pattern) for p in patterns if p.include]
+    if not include_regexes:
+        return lambda path: False
+    try:
+        combined = re.compile('|'.join(f'(?:{regex})' for regex in include_regexes))
+    except re.error:
+        return ignore_spec.match_file
+
+    if len(include_regexes) == len(patterns):
+        return lambda path: combined.search(path) is not None
+    return lambda path: combined.search(path) is not None and ignore_spec.match_file(path)
+
+class LazyIgnoreSpec:
+    """
+    Gitwildmatch ignore patterns whose per-path matchers are built lazily.
+
+    Every line is parsed up front, so an invalid ignore file raises here and
+    disables ignoring for the whole run rather than partway through the walk.
+    Patterns anchored below a literal top-level directory (e.g. 'docs/build/')
+    can only match paths inside that directory, so they are bucketed by it.
+    A path is tested against the unanchored patterns plus its own top-level
+    bucket, and each bucket's matcher is built the first time a path needs it.
+    """
+
+    def __init__(self, lines):
+        # from_lines skips empty lines, so drop them first to keep the parsed
+        # patterns aligned with the lines they came from
+        self.lines = [line for line in lines if line]
+        self._patterns = pathspec.PathSpec.from_lines('gitwildmatch', self.lines).patterns
+        self._line_dirs = [self._top_level_dir(line) for line in self.lines]
+        self._bucket_dirs = frozenset(d for d in self._line_dirs if d is not None)
+        self._matchers = {}  # top-level directory (None = no bucket) -> predicate
+
+    @staticmethod
+    def _top_level_dir(line):
+        """Literal top-level directory a pattern is anchored under, or None."""
+        body = line[1:] if line.startswith('!') else line
+        anchored = body.startswith('/')
+        body = body.lstrip('/').rstrip()
+        if not anchored and '/' not in body.rstrip('/'):
+            return None  # Matches at any depth
+        first = body.split('/', 1)[0]
+        if not first or first == '**' or any(c in first for c in '*?[\\'):
+            return None
+        return first
+
+    def _compile(self, top):
+        # Keep the file's order: later patterns (negations) override earlier ones
+        patterns = [pattern for pattern, d in zip(self._patterns, self._line_dirs) if d is None or d == top]
+        return compile_ignore_matcher(pathspec.PathSpec(patterns))
+
+    def match_file(self, path):
+        top = path.split('/', 1)[0]
+        if top not in self._bucket_dirs:
+            top = None
+        matcher = self._matchers.get(top)
+        if matcher is None:
+            matcher = self._matchers[top] = self._compile(top)
+        return matcher(path)
+
 def should_include_file(file_path, allowed_extensions, gitignore_patterns=None):
     """
     Determine if file should be included in the summary.
@@ -1273,161 +1571,230 @@ def print_file_contents(starting_dir='.', output_file=None, toc=False, ignore_sp
         starting_dir (str): Directory to start processing from (default: current directory).
         output_file (str): Path to output file (if None, prints to console).
         toc (bool): If True, generates a table of contents.
-        ignore_spec (pathspec.PathSpec): Patterns to exclude files/directories (optional).
+        ignore_spec (LazyIgnoreSpec or pathspec.PathSpec): Patterns to exclude files/directories (optional).
         ignore_extensions (set): File extensions to exclude (optional).
     """
     base_path = Path(starting_dir).resolve()
-    output = open(output_file, 'w', encoding='utf-8') if output_file else None
+    is_ignored = compile_ignore_matcher(ignore_spec) if ignore_spec else None
+    if output_file:
+        # A large buffer turns the many small per-file writes into ~1 syscall per MiB
+        # newline='\n' writes text through untranslated, so no per-write
+        # newline scan, and the file has the same line endings on every OS
+        output = open(output_file, 'w', encoding='utf-8', buffering=1 << 20, newline='\n')
+        write = output.write
+        # File blocks go to the buffer fragment by fragment, without first
+        # being joined into one string
+        write_parts = output.writelines
+    else:
+        output = None
+        stdout_write = sys.stdout.write
+
+        def write(text):
+            # Same bytes as print(text), without print's per-call overhead
+            stdout_write(text)
+            stdout_write('\n')
+
+        def write_parts(parts):
+            # print() semantics put one newline after each block, so join first
+            write(''.join(parts))
     files_to_include = []
-    ignore_extensions = set(ignore_extensions or [])
+    file_entries = {}  # relative path -> os.DirEntry, reused when reading files
+    file_exts = {}  # relative path -> lowercased extension, found during the walk
+    executor = None
 
     gitignore_patterns = load_gitignore_patterns(base_path)
     if gitignore_patterns:
         print(f"Loaded {len(gitignore_patterns)} patterns from .gitignore")
         
     try:
-        for root, dirs, files in os.walk(starting_dir):
-            relative_root = os.path.relpath(root, base_path).replace(os.sep, '/')
-            
-            if should_auto_ignore(relative_root + '/'):
-                dirs[:] = []  # Skip this directory and its subdirectories
-                continue
-            
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext not in ALLOWED_EXTENSIONS or ext in ignore_extensions:
-                    continue
-                full_path = os.path.join(root, file)
-                relative_path = os.path.relpath(full_path, base_path).replace(os.sep, '/')
-                if ignore_spec and ignore_spec.match_file(relative_path):
-                    continue
-                if output_file and Path(full_path).resolve() == Path(output_file).resolve():
-                    continue
-                
-                if should_auto_ignore(relative_path):
-                    continue
-                    
-                if gitignore_patterns and matches_gitignore(relative_path, gitignore_patterns):
-                    continue
-                
+        # Depth-first traversal with os.scandir. DirEntry carries the file type
+        # from the directory read itself, so unlike os.walk we never stat plain
+        # files or directories just to tell them apart.
+        base_str = str(base_path)
+        # Resolve the output file once. Walked paths are built from the resolved
+        # base and never pass through symlinked directories, so only symlinked
+        # files need resolving to compare against it.
+        output_real = os.path.realpath(output_file) if output_file else None
+        # --ignore-ext is folded into the allow-list once, so each file costs
+        # a single set lookup
+        is_allowed_ext = (ALLOWED_EXTENSIONS - set(ignore_extensions or ())).__contains__
+        # Auto-ignore and .gitignore directory patterns prune whole subtrees, so
+        # a file only needs the checks that depend on its own name
+        dir_gitignored, file_gitignored = compile_gitignore_matchers(gitignore_patterns or ())
+        # The stack holds directories still to scan as (full path, relative
+        # prefix); relative paths are the parent's prefix plus the entry name.
+        # As with os.walk, a directory's own files come before anything in its
+        # subdirectories; both are sorted by name so the order doesn't depend
+        # on the filesystem.
+        pending = [(base_str, '')]
+        while pending:
+            path, rel_prefix = pending.pop()
+
+            files = []
+            subdirs = []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            # Like os.walk, never descend into symlinked directories
+                            if entry.is_symlink():
+                                continue
+                            if entry.name in _AUTO_IGNORE_DIRS:
+                                continue  # Skip this directory and its subdirectories
+                            relative_root = rel_prefix + entry.name + '/'
+                            if dir_gitignored and dir_gitignored(relative_root):
+                                continue
+                            # An ignored directory excludes its whole subtree (as in git), so
+                            # the spec is evaluated once per directory, never per descendant
+                            if is_ignored and is_ignored(relative_root):
+                                continue
+                            subdirs.append((entry.name, entry.path, relative_root))
+                            continue
+
+                        # Same result as os.path.splitext: leading dots don't start an extension
+                        name = entry.name
+                        dot = name.rfind('.')
+                        if dot <= 0 or (name[0] == '.' and not name[:dot].strip('.')):
+                            continue
+                        ext = name[dot:].lower()
+                        if not is_allowed_ext(ext):
+                            continue
+                        relative_path = rel_prefix + name
+                        if is_ignored and is_ignored(relative_path):
+                            continue
+                        if output_real and (os.path.realpath(entry.path) if entry.is_symlink() else entry.path) == output_real:
+                            continue
+
+                        if name in _AUTO_IGNORE_NAMES or name.endswith(_AUTO_IGNORE_SUFFIXES):
+                            continue
+
+                        if file_gitignored and file_gitignored(relative_path):
+                            continue
+
+                        files.append((name, relative_path, entry, ext))
+            except OSError:
+                pass  # Unreadable directory - os.walk skipped these silently too
+
+            # Names are unique within a directory, so the tuples never compare
+            # their DirEntry members
+            files.sort()
+            for _, relative_path, entry, ext in files:
                 files_to_include.append(relative_path)
-        
-        prioritized_files, entry_points = prioritize_files(files_to_include, base_path)
-        
-        # Analyze dependencies and tech stack
-        dependency_analysis = analyze_dependencies(files_to_include, base_path)
+                file_entries[relative_path] = entry
+                file_exts[relative_path] = ext
+            # Pushed in reverse so subdirectories are scanned in name order
+            subdirs.sort(reverse=True)
+            pending.extend((subdir_path, relative_root) for _, subdir_path, relative_root in subdirs)
+
+        prioritized_files, entry_points, config_files = prioritize_files(files_to_include, base_path)
+
+        # Read every file exactly once, up front: the overview needs line totals
+        # before any file body is written. Reads are I/O-bound and release the
+        # GIL, so larger trees read on a thread pool; map() keeps results in
+        # input order, which keeps the output deterministic. A file listed under
+        # more than one category is read once and looked up by path.
+        unique_files = list(dict.fromkeys(prioritized_files))
+        entries = [file_entries[relative_path] for relative_path in unique_files]
+        if len(entries) >= PARALLEL_READ_MIN_FILES:
+            executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+            # Dependency analysis (tech stack) parses its manifests on one of the
+            # workers, overlapping the bulk reads; it runs as a single task
+            # because the analyzers accumulate into shared, order-dependent state
+            dependency_future = executor.submit(analyze_dependencies, files_to_include, base_path)
+            file_reads = dict(zip(unique_files, executor.map(read_file_for_summary, entries, unique_files)))
+            dependency_analysis = dependency_future.result()
+        else:
+            dependency_analysis = analyze_dependencies(files_to_include, base_path)
+            file_reads = {relative_path: read_file_for_summary(entry, relative_path)
+                          for entry, relative_path in zip(entries, unique_files)}
 
         # Write top-level heading and initial message
         message = "# Codebase Summary\n\nThe following is a complete codebase summary optimized for structural analysis. Files are prioritized by importance - entry points and configuration first, followed by core application logic. This ordering helps establish program flow and architecture context upfront.\n\n"
-        if output:
-            output.write(message)
-        else:
-            print(message)
+        write(message)
 
         # Compute project overview with entry point analysis
         lang_counts = {}
-        total_lines = 0
         for rel_path in files_to_include:
-            ext = os.path.splitext(rel_path)[1].lower()
-            lang = EXT_TO_LANG.get(ext, 'unknown')
+            lang = EXT_TO_LANG.get(file_exts[rel_path], 'unknown')
             lang_counts[lang] = lang_counts.get(lang, 0) + 1
-            try:
-                with open(base_path / rel_path, 'r', encoding='utf-8') as f:
-                    total_lines += sum(1 for _ in f)
-            except:
-                pass
-        
-        # Enhanced project overview with entry point information and tech stack
-        dep_files = [f for f in files_to_include if os.path.basename(f) in ('package.json', 'pom.xml', 'requirements.txt', 'build.gradle', 'pyproject.toml', 'go.mod', 'cargo.toml', 'pubspec.yaml')]
-        dep_summary = f"- Dependency files: {', '.join(dep_files)}\n" if dep_files else "- Dependency files: None detected\n"
+
+        # Line totals come from the contents already read above; files that
+        # could not be read don't count
+        total_lines = sum(line_count for _, _, line_count, _, read_error in file_reads.values() if read_error is None)
+        
+        # Enhanced project overview with entry point information and tech stack,
+        # collected as fragments and written in one call
+        dep_files = [f for f in files_to_include if f[f.rfind('/') + 1:] in DEPENDENCY_FILENAMES]
+        overview = [
+            "## Project Overview\n\n- Total files: ", str(len(files_to_include)),
+            "\n- Languages used: ", ', '.join(sorted(lang_counts)),
+            "\n- Approximate total lines: ", str(total_lines), "\n",
+        ]
+        if dep_files:
+            overview += ["- Dependency files: ", ', '.join(dep_files), "\n\n"]
+        else:
+            overview.append("- Dependency files: None detected\n\n")
 
         # Entry points summary for context
-        entry_summary = "## Entry Points & Architecture\n\n"
+        overview.append("## Entry Points & Architecture\n\n")
         if entry_points['main_entry']:
-            entry_summary += f"**Main Entry Points**: {', '.join(entry_points['main_entry'])}\n"
+            overview += ["**Main Entry Points**: ", ', '.join(entry_points['main_entry']), "\n"]
         if entry_points['config_entry']:
-            entry_summary += f"**Configuration**: {', '.join(entry_points['config_entry'])}\n"
+            overview += ["**Configuration**: ", ', '.join(entry_points['config_entry']), "\n"]
         if entry_points['startup_scripts']:
-            entry_summary += f"**Startup Scripts**: {', '.join(entry_points['startup_scripts'])}\n"
+            overview += ["**Startup Scripts**: ", ', '.join(entry_points['startup_scripts']), "\n"]
         if entry_points['api_routes']:
-            entry_summary += f"**API/Routes**: {', '.join(entry_points['api_routes'])}\n"
-        entry_summary += "\n"
+            overview += ["**API/Routes**: ", ', '.join(entry_points['api_routes']), "\n"]
+        overview.append("\n")
 
         # Configuration files summary for context
-        config_files = detect_critical_config_files(files_to_include) + detect_other_config_files(files_to_include, detect_critical_config_files(files_to_include))
-        config_summary = ""
         if config_files:
-            config_summary = "## Configuration Files\n\n"
+            overview.append("## Configuration Files\n\n")
             for config_file in config_files[:8]:  # Show first 8 config files
                 desc = get_config_file_description(config_file)
-                if desc:
-                    config_summary += f"**{config_file}**: {desc}\n"
-                else:
-                    config_summary += f"**{config_file}**: Configuration file\n"
+                overview += ["**", config_file, "**: ", desc or "Configuration file", "\n"]
             if len(config_files) > 8:
-                config_summary += f"*...and {len(config_files) - 8} more configuration files*\n"
-            config_summary += "\n"
+                overview.append(f"*...and {len(config_files) - 8} more configuration files*\n")
+            overview.append("\n")
         
         # Add dependency analysis
-        dependency_summary = format_dependency_summary(dependency_analysis)
-        
-        overview = f"## Project Overview\n\n- Total files: {len(files_to_include)}\n- Languages used: {', '.join(sorted(lang_counts.keys()))}\n- Approximate total lines: {total_lines}\n{dep_summary}\n{entry_summary}{config_summary}{dependency_summary}"
+        overview.append(format_dependency_summary(dependency_analysis))
         
-        if output:
-            output.write(overview)
-        else:
-            print(overview)
+        write_parts(overview)
 
         # Generate table of contents if requested
         if toc:
             toc_header = "## Table of Contents (Prioritized Order)\n\n"
             toc_content = build_tree(prioritized_files)
             toc_str = toc_header + toc_content + "\n\n"
-            if output:
-                output.write(toc_str)
-            else:
-                print(toc_str)
+            write(toc_str)
         
         # Add code files subheading
         code_files_header = "## Code Files (Priority Order)\n\n*Files are ordered by importance for analysis: entry points → configuration → core logic → supporting files*\n\n"
-        if output:
-            output.write(code_files_header)
-        else:
-            print(code_files_header)
+        write(code_files_header)
         
+        # File role for context; categories are disjoint, first match wins
+        file_roles = {}
+        for category, role in ENTRY_ROLE_LABELS:
+            for file_path in entry_points[category]:
+                file_roles.setdefault(file_path, role)
+
         # Output each file's contents in prioritized order
         for relative_path in prioritized_files:
-            full_path = base_path / relative_path
-            ext = os.path.splitext(relative_path)[1].lower()
-            lang = EXT_TO_LANG.get(ext, '')
+            truncated_contents, was_truncated, line_count, file_size, read_error = file_reads[relative_path]
+            lang = EXT_TO_LANG.get(file_exts[relative_path], '')
             
-            # Determine file role for context
-            role_indicators = []
-            if relative_path in entry_points['main_entry']:
-                role_indicators.append("**MAIN ENTRY POINT**")
-            elif relative_path in entry_points['config_entry']:
-                role_indicators.append("**CONFIGURATION**")
-            elif relative_path in entry_points['startup_scripts']:
-                role_indicators.append("**STARTUP SCRIPT**")
-            elif relative_path in entry_points['api_routes']:
-                role_indicators.append("**API/ROUTES**")
-            elif relative_path in entry_points['other_important']:
-                role_indicators.append("**BUILD/DEPLOY**")
-            
-            header = f"\n### {relative_path}\n\n"
-            try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    contents = f.read()
-                    
-                truncated_contents, was_truncated = smart_truncate_by_chars(contents, relative_path)
-                
-                line_count = len(contents.splitlines())
-                file_size = os.path.getsize(full_path)
-                
+            # Collect the block as fragments and write them in one call
+            parts = ['\n### ', relative_path, '\n\n']
+            if read_error is not None:
+                parts += ['**Metadata**: Error reading file\n\n# Error reading file: ', str(read_error),
+                          '\n\n```', lang, '\n```\n\n']
+            else:
                 # Enhanced metadata with role, and config info
                 metadata_parts = [f"{line_count} lines, {file_size} bytes"]
-                if role_indicators:
-                    metadata_parts.append(role_indicators[0])
+                role = file_roles.get(relative_path)
+                if role:
+                    metadata_parts.append(role)
                 
                 if was_truncated:
                     metadata_parts.append(f"**TRUNCATED** (showing ~{len(truncated_contents):,} chars)")
@@ -1437,26 +1804,24 @@ def print_file_contents(starting_dir='.', output_file=None, toc=False, ignore_sp
                 if config_desc:
                     metadata_parts.append(f"Config: {config_desc}")
                 
-                metadata = f"**Metadata**: {' | '.join(metadata_parts)}\n\n"
+                parts += ['**Metadata**: ', ' | '.join(metadata_parts), '\n\n']
                 
                 if was_truncated:
-                    metadata += f"📄 **LARGE FILE NOTICE**: This file was truncated for readability.\n"
-                    metadata += f"**Original size**: {line_count:,} lines ({file_size:,} bytes)\n"
-                    metadata += f"**To see complete file**: Ask me to \"show the full contents of {relative_path}\"\n\n"
+                    parts += ["📄 **LARGE FILE NOTICE**: This file was truncated for readability.\n",
+                              f"**Original size**: {line_count:,} lines ({file_size:,} bytes)\n",
+                              f"**To see complete file**: Ask me to \"show the full contents of {relative_path}\"\n\n"]
                 
-                output_str = header + metadata + f"```{lang}\n{truncated_contents.rstrip()}\n```\n\n"
-                
-            except Exception as e:
-                output_str = header + f"**Metadata**: Error reading file\n\n# Error reading file: {str(e)}\n\n```{lang}\n```\n\n"
+                parts += ['```', lang, '\n', truncated_contents.rstrip(), '\n```\n\n']
             
-            if output:
-                output.write(output_str)
-            else:
-                print(output_str)
+            write_parts(parts)
                 
     finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
         if output:
             output.close()
+        else:
+            sys.stdout.flush()
 
 if __name__ == "__main__":
     # Set up command-line arguments
@@ -1482,7 +1847,9 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         '--ignore-file',
-        help="Path to ignore file (default: 'ignore' in script directory)"
+        help="Path to ignore file (default: 'ignore' in script directory). As in git, "
+             "an ignored directory excludes its whole subtree: '!' patterns cannot "
+             "re-include files below it"
     )
     parser.add_argument(
         '--ignore-ext',
@@ -1506,7 +1873,7 @@ if __name__ == "__main__":
                 try:
                     with open(ignore_file, 'r', encoding='utf-8') as f:
                         ignore_patterns = f.read().splitlines()
-                    ignore_spec = pathspec.PathSpec.from_lines('gitwildmatch', ignore_patterns)
+                    ignore_spec = LazyIgnoreSpec(ignore_patterns)
                 except Exception as e:
                     print(f"Error parsing ignore file: {str(e)}. Proceeding without ignoring.")
         else: